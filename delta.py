@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import re
+from datetime import datetime, timezone
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+
+# Query params that change on every visit without the content changing
+TRACKING_PARAMS = {"fbclid"}
+# Only stripped on facebook.com links; elsewhere they can be meaningful
+FACEBOOK_TRACKING_PARAMS = {"h", "acontext", "__cft__", "__tn__", "ref", "refid", "mibextid"}
+# Rotating signature params on Facebook CDN media (oh, oe, _nc_*)
+FBCDN_SIGNATURE_PARAMS = {"oh", "oe"}
+
+# Fields written to the time-series output when present and parseable
+DEFAULT_TIMESERIES_FIELDS = [
+    "responses_count",
+    "connections_count",
+    "posts_count",
+    "followers_count",
+    "following_count",
+    "followers",
+    "following",
+    "likes",
+    "videoCount",
+]
+
+_SUFFIXES = {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _on_host(host, domain):
+    return host == domain or host.endswith("." + domain)
+
+
+def _is_volatile_param(host, key):
+    if key in TRACKING_PARAMS or key.startswith("utm_"):
+        return True
+    if _on_host(host, "facebook.com"):
+        return key in FACEBOOK_TRACKING_PARAMS
+    if _on_host(host, "fbcdn.net"):
+        return key in FBCDN_SIGNATURE_PARAMS or key.startswith("_nc_")
+    return False
+
+
+def normalize_url(url):
+    """
+    Unwrap Facebook redirect links and drop tracking and CDN signature params so
+    the same target always produces the same string.
+    """
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    if host == "l.facebook.com" and parsed.path == "/l.php":
+        target = dict(parse_qsl(parsed.query)).get("u")
+        if target:
+            return normalize_url(target)
+    query = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+             if not _is_volatile_param(host, k)]
+    return urlunparse(parsed._replace(query=urlencode(query)))
+
+
+def normalize(value):
+    if isinstance(value, str) and value.startswith(("http://", "https://")):
+        return normalize_url(value)
+    if isinstance(value, dict):
+        return {k: normalize(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [normalize(v) for v in value]
+    return value
+
+
+def parse_count(value):
+    """
+    Turn '31.8K people responded', '1,234' or 5600 into a number, else None.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if not isinstance(value, str):
+        return None
+    match = re.search(r"(\d[\d,]*(?:\.\d+)?)\s*([KMBkmb])?\b", value)
+    if not match:
+        return None
+    number = float(match.group(1).replace(",", ""))
+    if match.group(2):
+        number *= _SUFFIXES[match.group(2).lower()]
+    return int(number) if number.is_integer() else number
+
+
+def field_hash(value):
+    encoded = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def timeseries_rows(key, record, fields=None, scraped_at=None):
+    """
+    One {entity, field, value, scraped_at} row per parseable numeric field of record.
+    """
+    if key is None:
+        return []
+    scraped_at = scraped_at or now_iso()
+    rows = []
+    for field in fields or DEFAULT_TIMESERIES_FIELDS:
+        value = parse_count(record.get(field))
+        if value is not None:
+            rows.append({"entity": key, "field": field, "value": value, "scraped_at": scraped_at})
+    return rows
+
+
+def entity_key(target, record):
+    if target == "facebook-event":
+        match = re.search(r"/events/(\d+)", record.get("link") or "")
+        if match:
+            return f"event:{match.group(1)}"
+    for field in ("username", "uniqueId", "link"):
+        if record.get(field):
+            return normalize(record[field])
+    return None
+
+
+class ChangeTracker:
+    """
+    Remembers the last version of every entity per target and turns new results
+    into snapshot, delta or heartbeat records.
+    """
+
+    def __init__(self, target, state_dir="outputs", timeseries_fields=None):
+        self.target = target
+        self.state_path = os.path.join(state_dir, f"{target}_state.json")
+        self.timeseries_fields = timeseries_fields or DEFAULT_TIMESERIES_FIELDS
+        self.state = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                try:
+                    self.state = json.load(f)
+                except json.JSONDecodeError:
+                    self.state = {}
+
+    def process(self, record):
+        """
+        Return (output_record, timeseries_rows) for one scraped record.
+        """
+        scraped_at = now_iso()
+        key = entity_key(self.target, record)
+        if key is None:
+            # Nothing stable to compare against; keep the full record
+            return {"type": "snapshot", "entity": None, "scraped_at": scraped_at, "data": record}, []
+        if (record.get("_meta") or {}).get("status") == "failed":
+            # Nothing was scraped; don't let the missing fields read as removals
+            return {"type": "failed", "entity": key, "scraped_at": scraped_at, "data": record}, []
+
+        current = normalize(record)
+        # Signed media URLs change on every scrape; compare by content hash when we have one
+        hashes = {field: field_hash(current.get(f"{field}_sha256") or value) for field, value in current.items()
+                  if not field.endswith("_path") and field != "_meta"}
+        previous = self.state.get(key)
+
+        if previous is None:
+            out = {"type": "snapshot", "entity": key, "scraped_at": scraped_at, "data": current}
+        else:
+            changed = {field: current.get(field) for field in hashes.keys() | previous["hashes"].keys()
+                       if hashes.get(field) != previous["hashes"].get(field)}
+            out = {
+                "type": "delta" if changed else "heartbeat",
+                "entity": key,
+                "scraped_at": scraped_at,
+                # State is only rewritten on change; heartbeats just move last_seen_at
+                "last_changed_at": previous["scraped_at"],
+                "last_seen_at": previous.get("last_seen_at", previous["scraped_at"]),
+            }
+            if changed:
+                out["changed"] = changed
+
+        if previous is None or out["type"] == "delta":
+            self.state[key] = {"hashes": hashes, "scraped_at": scraped_at}
+        else:
+            self.state[key]["last_seen_at"] = scraped_at
+
+        return out, timeseries_rows(key, current, self.timeseries_fields, scraped_at)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        with open(self.state_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False)
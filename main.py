@@ -2,9 +2,13 @@ import argparse
 import yaml
 import json
 import os
+import sys
 import asyncio
+import threading
+from functools import partial
 from dotenv import load_dotenv
-from scrapers import get_scraper
+from scrapers import get_scraper, available_scrapers, builtin_scrapers, is_registered
+from scrapers.circuit import call_with_policy, get_breakers, session_key
 
 load_dotenv()
 
@@ -14,52 +18,138 @@ def load_config(path):
 
 async def run_scraper(args, config):
     scraper = get_scraper(args.target)(config)
+    get_breakers(config)
 
     if args.mode == "discovery" and args.target == "facebook-event":
         return await scraper.scrape_discovery_events(limit=args.limit)
     elif args.mode == "single":
         if not args.link:
             raise ValueError("You must specify --link for single mode")
+        if not hasattr(scraper, "scrape_event_async"):
+            # Sync scrapers (and plugins) expose scrape(link) and own their browser
+            return await call_with_policy(
+                lambda: asyncio.to_thread(scraper.scrape, args.link),
+                args.target,
+                session_key(scraper),
+            )
         # create a temporary playwright instance inside main
         from playwright.async_api import async_playwright
         async with async_playwright() as p:
-            return await scraper.scrape_event_async(p, args.link)
+            return await call_with_policy(
+                lambda: scraper.scrape_event_async(p, args.link),
+                args.target,
+                session_key(scraper),
+            )
     else:
         raise ValueError("Invalid mode or unsupported target for discovery")
 
+# Serializes writers when the service saves results from several workers
+_output_lock = threading.Lock()
+
+def _append_json(path, records):
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            try:
+                existing_data = json.load(f)
+                combined_data = existing_data if isinstance(existing_data, list) else [existing_data]
+            except json.JSONDecodeError:
+                combined_data = []
+    else:
+        combined_data = []
+
+    combined_data.extend(records)
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(combined_data, f, ensure_ascii=False, indent=4)
+
+def save_output(target, result, config=None):
+    output_conf = (config or {}).get("output", {})
+    records = result if isinstance(result, list) else [result]
+
+    os.makedirs("outputs", exist_ok=True)
+    output_path = os.path.join("outputs", f"{target}_output.json")
+
+    with _output_lock:
+        if not output_conf.get("delta"):
+            _append_json(output_path, records)
+            if output_conf.get("timeseries"):
+                from delta import entity_key, timeseries_rows
+
+                series = [row for record in records
+                          for row in timeseries_rows(entity_key(target, record), record,
+                                                     output_conf.get("timeseries_fields"))]
+                if series:
+                    _append_json(os.path.join("outputs", f"{target}_timeseries.json"), series)
+            return output_path
+
+        from delta import ChangeTracker
+
+        output_path = os.path.join("outputs", f"{target}_delta.json")
+        tracker = ChangeTracker(target, "outputs", output_conf.get("timeseries_fields"))
+        deltas, series = [], []
+        for record in records:
+            out, rows = tracker.process(record)
+            deltas.append(out)
+            series.extend(rows)
+
+        _append_json(output_path, deltas)
+        if output_conf.get("timeseries") and series:
+            _append_json(os.path.join("outputs", f"{target}_timeseries.json"), series)
+        tracker.save()
+
+    changed = sum(1 for d in deltas if d["type"] in ("snapshot", "delta"))
+    unchanged = sum(1 for d in deltas if d["type"] == "heartbeat")
+    print(f"🔁 {changed} changed, {unchanged} unchanged, {len(deltas) - changed - unchanged} failed")
+    return output_path
+
+def serve(args, config):
+    from service import ScrapeService
+
+    service_conf = config.setdefault("service", {})
+    if args.host:
+        service_conf["host"] = args.host
+    if args.port:
+        service_conf["port"] = args.port
+    try:
+        asyncio.run(ScrapeService(config, on_result=partial(save_output, config=config)).serve_forever())
+    except KeyboardInterrupt:
+        print("🛑 Scrape service stopped")
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--conf", required=True)
-    parser.add_argument("--target", required=True, choices=["facebook", "instagram", "linkedin", "x", "facebook-event"])
-    parser.add_argument("--mode", choices=["single", "discovery"], default="single")
+    # Listing plugins means scanning every installed package; only do it for --help
+    targets = available_scrapers() if {"-h", "--help"} & set(sys.argv) else builtin_scrapers()
+    parser.add_argument("--target", help=f"One of: {', '.join(targets)} (or an installed plugin target)")
+    parser.add_argument("--mode", choices=["single", "discovery", "serve"], default="single")
     parser.add_argument("--link", help="URL of the Facebook event")
     parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--host", help="Bind address for serve mode")
+    parser.add_argument("--port", type=int, help="Port for serve mode")
+    parser.add_argument("--delta", action="store_true", help="Write only changes since the last scrape")
+    parser.add_argument("--media", action="store_true", help="Download photos and videos found in the results")
     args = parser.parse_args()
 
     config = load_config(args.conf)
+    if args.delta:
+        config.setdefault("output", {})["delta"] = True
+    if args.media:
+        config.setdefault("media", {})["enabled"] = True
 
-    result = asyncio.run(run_scraper(args, config))
-
-    os.makedirs("outputs", exist_ok=True)
-    output_path = os.path.join("outputs", f"{args.target}_output.json")
+    if args.mode == "serve":
+        return serve(args, config)
+    if not args.target:
+        parser.error("--target is required unless --mode serve")
+    if not is_registered(args.target):
+        parser.error(f"unknown --target {args.target!r} (choose from {', '.join(available_scrapers())})")
 
-    if os.path.exists(output_path):
-        with open(output_path, "r", encoding="utf-8") as f:
-            try:
-                existing_data = json.load(f)
-                combined_data = existing_data if isinstance(existing_data, list) else [existing_data]
-            except json.JSONDecodeError:
-                combined_data = []
-    else:
-        combined_data = []
+    result = asyncio.run(run_scraper(args, config))
 
-    if isinstance(result, list):
-        combined_data.extend(result)
-    else:
-        combined_data.append(result)
+    if config.get("media", {}).get("enabled"):
+        from media import download_media
+        result = asyncio.run(download_media(result, config))
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(combined_data, f, ensure_ascii=False, indent=4)
+    output_path = save_output(args.target, result, config)
 
     print(f"✅ Scraped data saved to {output_path}")
 
@@ -0,0 +1,243 @@
+import asyncio
+import hashlib
+import json
+import mimetypes
+import os
+import time
+
+import httpx
+
+from delta import normalize_url
+
+DEFAULT_MEDIA_CONFIG = {
+    "enabled": False,
+    "store_dir": "media",
+    "concurrency": 8,      # downloads in flight at once
+    "timeout": 30,         # seconds per request
+    "retries": 3,          # attempts per URL, resuming from the partial file
+    "fields": ["cover_photo", "profile_photo", "avatar", "play_url"],
+    "partial_ttl": 86400,  # seconds before an abandoned partial download is deleted
+    # Hosts that only serve media to the session that scraped it: Referer and that session's cookies
+    "session_hosts": {
+        "tiktok.com": {"referer": "https://www.tiktok.com/", "cookie_file": "session/tiktok_cookies.json"},
+    },
+}
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+CHUNK_SIZE = 64 * 1024
+
+
+def find_media(record, fields):
+    """
+    Yield (container, field, url) for every media URL in a (possibly nested) record.
+    """
+    if isinstance(record, list):
+        for item in record:
+            yield from find_media(item, fields)
+    elif isinstance(record, dict):
+        for key, value in record.items():
+            if key in fields and isinstance(value, str) and value.startswith(("http://", "https://")):
+                yield record, key, value
+            elif isinstance(value, (dict, list)):
+                yield from find_media(value, fields)
+
+
+class MediaStore:
+    """
+    Content-addressed store: files live at <root>/<sha[:2]>/<sha><ext>, so the same
+    image fetched through different (signed) URLs is kept once.
+    """
+
+    def __init__(self, root, partial_ttl=None):
+        self.root = root
+        self.partial_dir = os.path.join(root, ".partial")
+        os.makedirs(self.partial_dir, exist_ok=True)
+        if partial_ttl:
+            self.prune_partials(partial_ttl)
+
+    def partial_path(self, url):
+        # Keyed without the rotating signature params, so a re-signed URL resumes the same file
+        key = normalize_url(url)
+        return os.path.join(self.partial_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".part")
+
+    def prune_partials(self, max_age):
+        """
+        Delete partial downloads (and their validators) untouched for max_age seconds.
+        """
+        cutoff = time.time() - max_age
+        for name in os.listdir(self.partial_dir):
+            path = os.path.join(self.partial_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                # Being written or already removed by another downloader
+                pass
+
+    @staticmethod
+    def load_validator(partial):
+        try:
+            with open(partial + ".meta", "r", encoding="utf-8") as f:
+                return json.load(f).get("validator")
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def save_validator(partial, validator):
+        with open(partial + ".meta", "w", encoding="utf-8") as f:
+            json.dump({"validator": validator}, f)
+
+    def path_for(self, sha256, ext):
+        return os.path.join(self.root, sha256[:2], sha256 + ext)
+
+    def commit(self, partial, sha256, ext):
+        if os.path.exists(partial + ".meta"):
+            os.remove(partial + ".meta")
+        path = self.path_for(sha256, ext)
+        if os.path.exists(path):
+            os.remove(partial)
+            return path, True
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(partial, path)
+        return path, False
+
+
+class MediaDownloader:
+    """
+    Fetches media URLs concurrently over one pooled HTTP client into a MediaStore.
+    """
+
+    def __init__(self, config=None):
+        self.settings = {**DEFAULT_MEDIA_CONFIG, **(config or {}).get("media", {})}
+        self.store = MediaStore(self.settings["store_dir"], self.settings["partial_ttl"])
+        self._semaphore = asyncio.Semaphore(self.settings["concurrency"])
+        # One download per URL at a time: concurrent jobs would share the same .part file
+        self._inflight = {}
+        self._client = httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT},
+            timeout=self.settings["timeout"],
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.settings["concurrency"]),
+        )
+
+    async def close(self):
+        await self._client.aclose()
+
+    async def download(self, url):
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._download(url))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        # Shielded so one cancelled caller doesn't cancel the download for the others
+        return await asyncio.shield(task)
+
+    async def _download(self, url):
+        async with self._semaphore:
+            last_error = None
+            for attempt in range(self.settings["retries"]):
+                try:
+                    return await self._fetch(url)
+                except (httpx.HTTPError, httpx.InvalidURL, OSError) as e:
+                    last_error = e
+                    # Only network failures and 5xx are worth another attempt
+                    transient = isinstance(e, httpx.TransportError) or (
+                        isinstance(e, httpx.HTTPStatusError) and e.response.status_code >= 500
+                    )
+                    if not transient or attempt == self.settings["retries"] - 1:
+                        break
+                    await asyncio.sleep(2 ** attempt)
+            print(f"⚠️ Failed to download media {url}: {last_error}")
+            return {"url": url, "error": str(last_error)}
+
+    def _session_headers(self, url):
+        host = (httpx.URL(url).host or "").lower()
+        for domain, session in self.settings["session_hosts"].items():
+            if host != domain and not host.endswith("." + domain):
+                continue
+            headers = {"Referer": session["referer"]}
+            try:
+                with open(session["cookie_file"], "r", encoding="utf-8") as f:
+                    cookies = json.load(f)
+                headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in cookies.items())
+            except (OSError, ValueError):
+                print(f"⚠️ No session cookies for {domain} media; scrape it first")
+            return headers
+        return {}
+
+    async def _fetch(self, url):
+        partial = self.store.partial_path(url)
+        offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+        validator = self.store.load_validator(partial) if offset else None
+        headers = self._session_headers(url)
+        # Only resume when the server can tell us the bytes on disk are still the same file
+        if offset and validator:
+            headers.update({"Range": f"bytes={offset}-", "If-Range": validator})
+        else:
+            offset = 0
+
+        content_type = ""
+        async with self._client.stream("GET", url, headers=headers) as response:
+            # 416 on a resume means the partial file already holds the whole body
+            if not (offset and response.status_code == 416):
+                response.raise_for_status()
+                if offset and response.status_code != 206:
+                    # Range ignored, or If-Range says the file changed; start over
+                    offset = 0
+                if not offset:
+                    self._remember_validator(partial, response)
+                with open(partial, "ab" if offset else "wb") as f:
+                    async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                        f.write(chunk)
+                content_type = response.headers.get("content-type", "").split(";")[0].strip()
+
+        sha256 = await asyncio.to_thread(self._hash_file, partial)
+        ext = mimetypes.guess_extension(content_type) or os.path.splitext(httpx.URL(url).path)[1]
+        path, duplicate = self.store.commit(partial, sha256, ext or "")
+        return {"url": url, "sha256": sha256, "path": path, "duplicate": duplicate}
+
+    def _remember_validator(self, partial, response):
+        # Weak ETags can't be used with If-Range
+        etag = response.headers.get("etag")
+        validator = etag if etag and not etag.startswith("W/") else response.headers.get("last-modified")
+        if validator:
+            self.store.save_validator(partial, validator)
+        elif os.path.exists(partial + ".meta"):
+            os.remove(partial + ".meta")
+
+    @staticmethod
+    def _hash_file(path):
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    async def process(self, result):
+        """
+        Download every media URL in result and record <field>_sha256 (and _path) next to it.
+        """
+        found = list(find_media(result, self.settings["fields"]))
+        if not found:
+            return result
+        # The same URL can appear more than once (e.g. repeated avatars)
+        unique = list(dict.fromkeys(url for _, _, url in found))
+        downloads = await asyncio.gather(*(self.download(url) for url in unique))
+        by_url = dict(zip(unique, downloads))
+
+        for container, field, url in found:
+            info = by_url[url]
+            container[f"{field}_sha256"] = info.get("sha256")
+            container[f"{field}_path"] = info.get("path")
+
+        fetched = sum(1 for d in downloads if d.get("sha256") and not d.get("duplicate"))
+        print(f"🖼️ Media: {fetched} new, {len(downloads) - fetched} duplicate or failed")
+        return result
+
+
+async def download_media(result, config):
+    downloader = MediaDownloader(config)
+    try:
+        return await downloader.process(result)
+    finally:
+        await downloader.close()
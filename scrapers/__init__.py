@@ -1,19 +1,80 @@
-from .fb_scraper import FacebookScraper
-from .fb_event_scraper import FacebookEventScraper
-from .insta_scraper import InstagramScraper
-from .x_scraper import XScraper
-from .linkedin_scraper import LinkedInScraper
+import importlib
+from importlib.metadata import entry_points
+
+# Built-in targets, resolved lazily as "module:Class" so a run only imports
+# the scraper (and its heavy dependencies) it actually needs.
+_BUILTIN_SCRAPERS = {
+    "facebook": "scrapers.fb_scraper:FacebookScraper",
+    "facebook-event": "scrapers.fb_event_scraper:FacebookEventScraper",
+    "instagram": "scrapers.insta_scraper:InstagramScraper",
+    "x": "scrapers.x_scraper:XScraper",
+    "linkedin": "scrapers.linkedin_scraper:LinkedInScraper",
+}
+
+# Third-party scrapers can register under this entry point group, e.g.
+#   [project.entry-points."scraper_socmed.scrapers"]
+#   reddit = "my_pkg.reddit:RedditScraper"
+ENTRY_POINT_GROUP = "scraper_socmed.scrapers"
+
+_registry = dict(_BUILTIN_SCRAPERS)
+_loaded = {}
+_plugins_discovered = False
+
+
+def _discover_plugins():
+    global _plugins_discovered
+    if _plugins_discovered:
+        return
+    _plugins_discovered = True
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        # Built-ins win so a plugin can't silently shadow them
+        _registry.setdefault(ep.name, ep)
+
+
+def register_scraper(platform, target):
+    """
+    Register a scraper class (or a "module:Class" path) under a platform name.
+    """
+    _registry[platform] = target
+    _loaded.pop(platform, None)
+
+
+def available_scrapers():
+    """
+    All target names, including entry-point plugins (scans installed packages).
+    """
+    _discover_plugins()
+    return sorted(_registry)
+
+
+def builtin_scrapers():
+    return sorted(_BUILTIN_SCRAPERS)
+
+
+def is_registered(platform):
+    # Only scan entry points for names we don't already know
+    if platform not in _registry:
+        _discover_plugins()
+    return platform in _registry
+
 
 def get_scraper(platform):
-    if platform == "facebook":
-        return FacebookScraper
-    elif platform == "facebook-event":
-        return FacebookEventScraper
-    elif platform == "instagram":
-        return InstagramScraper
-    elif platform == "x":
-        return XScraper
-    elif platform == "linkedin":
-        return LinkedInScraper
-    else:
+    if platform in _loaded:
+        return _loaded[platform]
+
+    if platform not in _registry:
+        _discover_plugins()
+    target = _registry.get(platform)
+    if target is None:
         raise ValueError(f"Unsupported platform: {platform}")
+
+    if isinstance(target, str):
+        module_name, _, attr = target.partition(":")
+        cls = getattr(importlib.import_module(module_name), attr)
+    elif hasattr(target, "load"):
+        cls = target.load()
+    else:
+        cls = target
+
+    _loaded[platform] = cls
+    return cls
@@ -0,0 +1,207 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+
+from .errors import CircuitOpenError, classify
+
+DEFAULT_BREAKER_CONFIG = {
+    "window": 20,           # recent outcomes considered
+    "min_calls": 5,         # outcomes needed before the failure rate can open the breaker
+    "failure_rate": 0.5,    # share of failures in the window that opens the breaker
+    "cooldown": 120,        # seconds open before a trial call is let through
+}
+
+# How each error kind is retried and whether it says anything about platform health
+# (counts) or about the login session (session_counts, trip_session)
+RETRY_POLICY = {
+    "timeout":       {"retries": 2, "backoff": 5, "counts": True, "session_counts": False, "trip_session": False},
+    "rate_limited":  {"retries": 0, "backoff": 0, "counts": True, "session_counts": True, "trip_session": True},
+    "auth":          {"retries": 0, "backoff": 0, "counts": True, "session_counts": True, "trip_session": True},
+    "selector_miss": {"retries": 0, "backoff": 0, "counts": True, "session_counts": False, "trip_session": False},
+    "not_found":     {"retries": 0, "backoff": 0, "counts": False, "session_counts": False, "trip_session": False},
+    "circuit_open":  {"retries": 0, "backoff": 0, "counts": False, "session_counts": False, "trip_session": False},
+    "unknown":       {"retries": 1, "backoff": 5, "counts": True, "session_counts": False, "trip_session": False},
+}
+
+_breakers = None
+_breakers_lock = threading.Lock()
+
+
+def get_breakers(config=None):
+    """
+    Return the process-wide breaker registry, creating it from config["breakers"] on first use.
+    """
+    global _breakers
+    with _breakers_lock:
+        if _breakers is None:
+            _breakers = BreakerRegistry((config or {}).get("breakers"))
+        return _breakers
+
+
+def session_key(scraper):
+    """
+    Identify the login session a scraper runs under, for per-session breakers.
+    """
+    path = getattr(scraper, "session_file", None)
+    return os.path.basename(path) if path else None
+
+
+class CircuitBreaker:
+    def __init__(self, name, window, min_calls, failure_rate, cooldown):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.cooldown = cooldown
+        self.outcomes = deque(maxlen=window)
+        self.state = "closed"
+        self.opened_at = None
+        self.reason = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "open" and time.time() - self.opened_at >= self.cooldown:
+                self.state = "half_open"
+            if self.state == "half_open":
+                # One trial call at a time; everyone else waits for its outcome
+                if self._trial_in_flight:
+                    return False
+                self._trial_in_flight = True
+            return self.state != "open"
+
+    def release(self):
+        """
+        End a call admitted by allow() whose outcome wasn't recorded here, freeing the trial slot.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def is_open(self):
+        with self._lock:
+            return self.state == "open"
+
+    def record_success(self):
+        with self._lock:
+            self.outcomes.append(True)
+            self._trial_in_flight = False
+            if self.state == "half_open":
+                self._close()
+
+    def record_failure(self, kind):
+        with self._lock:
+            self.outcomes.append(False)
+            self._trial_in_flight = False
+            if self.state == "half_open":
+                self._open(f"trial call failed ({kind})")
+                return
+            failures = self.outcomes.count(False)
+            if len(self.outcomes) >= self.min_calls and failures / len(self.outcomes) >= self.failure_rate:
+                self._open(f"{failures}/{len(self.outcomes)} recent calls failed, last: {kind}")
+
+    def trip(self, reason):
+        with self._lock:
+            self._open(reason)
+
+    def _open(self, reason):
+        self._trial_in_flight = False
+        if self.state != "open":
+            print(f"⛔ Circuit open for {self.name}: {reason}")
+        self.state = "open"
+        self.opened_at = time.time()
+        self.reason = reason
+
+    def _close(self):
+        print(f"✅ Circuit closed for {self.name}")
+        self.state = "closed"
+        self.outcomes.clear()
+        self.reason = None
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "reason": self.reason,
+                "opened_at": self.opened_at,
+                "recent_failures": self.outcomes.count(False),
+                "recent_calls": len(self.outcomes),
+            }
+
+
+class BreakerRegistry:
+    """
+    Breakers keyed by platform ("facebook") and by login session ("session:<name>").
+    """
+
+    def __init__(self, settings=None):
+        self.settings = {**DEFAULT_BREAKER_CONFIG, **(settings or {})}
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(name, **self.settings)
+            return self._breakers[name]
+
+    def snapshot(self):
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.snapshot() for name, breaker in breakers.items()}
+
+
+async def call_with_policy(fn, platform, session=None, breakers=None):
+    """
+    Await fn() guarded by the platform and session breakers, retrying according to
+    the classified error kind. Raises a ScrapeError subclass on final failure.
+    """
+    breakers = breakers or get_breakers()
+    platform_breaker = breakers.get(platform)
+    # Keyed by session alone: facebook and facebook-event share one login
+    session_breaker = breakers.get(f"session:{session}") if session else None
+    guards = [b for b in (session_breaker, platform_breaker) if b]
+
+    admitted = []
+    try:
+        # Admitted once per call: a half-open breaker's trial covers all of its retries
+        for breaker in guards:
+            if not breaker.allow():
+                raise CircuitOpenError(f"Circuit open for {breaker.name}: {breaker.reason}")
+            admitted.append(breaker)
+
+        attempt = 0
+        while True:
+            try:
+                result = await fn()
+            except Exception as e:
+                err = classify(e)
+                policy = RETRY_POLICY.get(err.kind, RETRY_POLICY["unknown"])
+                if attempt < policy["retries"]:
+                    attempt += 1
+                    print(f"🔁 Retrying after {err.kind} ({attempt}/{policy['retries']})")
+                    await asyncio.sleep(policy["backoff"] * 2 ** (attempt - 1))
+                    # Another call may have opened a breaker while we backed off
+                    for breaker in guards:
+                        if breaker.is_open():
+                            raise CircuitOpenError(f"Circuit open for {breaker.name}: {breaker.reason}") from e
+                    continue
+                # One outcome per call, however many attempts it took. Platform failures
+                # (timeouts, markup changes) say nothing about the login session
+                if policy["counts"]:
+                    platform_breaker.record_failure(err.kind)
+                if policy["session_counts"] and session_breaker:
+                    session_breaker.record_failure(err.kind)
+                if policy["trip_session"] and session_breaker:
+                    session_breaker.trip(f"{err.kind}: {err}")
+                if err is e:
+                    raise
+                raise err from e
+            for breaker in guards:
+                breaker.record_success()
+            return result
+    finally:
+        # Frees a half-open trial slot on breakers this call recorded nothing on
+        for breaker in admitted:
+            breaker.release()
@@ -0,0 +1,118 @@
+import asyncio
+import re
+
+
+class ScrapeError(Exception):
+    """
+    Base class for classified scrape failures; kind is what breakers and retry
+    policies key on.
+    """
+    kind = "unknown"
+
+    def to_dict(self):
+        return {"kind": self.kind, "message": str(self)}
+
+
+class AuthError(ScrapeError):
+    kind = "auth"
+
+
+class RateLimitedError(ScrapeError):
+    kind = "rate_limited"
+
+
+class NotFoundError(ScrapeError):
+    kind = "not_found"
+
+
+class ScrapeTimeoutError(ScrapeError):
+    kind = "timeout"
+
+
+class SelectorMissError(ScrapeError):
+    kind = "selector_miss"
+
+
+class CircuitOpenError(ScrapeError):
+    kind = "circuit_open"
+
+
+_AUTH_URL = re.compile(r"/(login|checkpoint|challenge|accounts/login|two_step_verification)\b")
+# Phrases matched in exception messages and in page text.
+# Order matters: a blocked session often also mentions login
+_PATTERNS = [
+    (RateLimitedError, re.compile(r"too many requests|rate.?limit|temporarily blocked|try again later", re.I)),
+    (AuthError, re.compile(r"checkpoint|\blog ?in\b|ms_token|session expired|not logged in", re.I)),
+    (NotFoundError, re.compile(r"not found|isn't available|no longer available|invalid .* url|unsupported .* link", re.I)),
+]
+# Bare status codes; only meaningful in exception messages ("403 people went" is page text)
+_STATUS_PATTERNS = [
+    (RateLimitedError, re.compile(r"\b429\b")),
+    (AuthError, re.compile(r"\b40[13]\b")),
+    (NotFoundError, re.compile(r"\b404\b")),
+]
+
+
+def classify(exc):
+    """
+    Map any exception to a ScrapeError subclass (returned as-is if it already is one).
+    """
+    if isinstance(exc, ScrapeError):
+        return exc
+    message = str(exc) or type(exc).__name__
+    # Playwright's TimeoutError doesn't subclass the builtin one
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError)) or type(exc).__name__ == "TimeoutError":
+        return ScrapeTimeoutError(message)
+    # Phrase and status code per kind, keeping the rate-limit > auth > not-found order
+    for rules in zip(_PATTERNS, _STATUS_PATTERNS):
+        for error_cls, pattern in rules:
+            if pattern.search(message):
+                return error_cls(message)
+    # Missing elements are only selector_miss when a scraper raises SelectorMissError itself
+    return ScrapeError(message)
+
+
+def classify_page(url, text=""):
+    """
+    Explain why an expected page didn't render: login wall, removed content or block.
+    """
+    if _AUTH_URL.search(url or ""):
+        return AuthError(f"Redirected to login/checkpoint: {url}")
+    for error_cls, pattern in _PATTERNS:
+        if pattern.search(text or ""):
+            return error_cls(f"{pattern.search(text).group(0)}: {url}")
+    return None
+
+
+def body_text(page):
+    """
+    Best-effort page text for classify_page; never raises.
+    """
+    try:
+        return page.inner_text("body", timeout=5000)
+    except Exception:
+        return ""
+
+
+async def body_text_async(page):
+    try:
+        return await page.inner_text("body", timeout=5000)
+    except Exception:
+        return ""
+
+
+class ErrorLog:
+    """
+    Collects per-field extraction errors for a result's _meta block.
+    """
+
+    def __init__(self):
+        self.errors = []
+
+    def add(self, field, exc):
+        err = classify(exc)
+        self.errors.append({"field": field, "kind": err.kind, "message": str(exc)[:200]})
+        return err
+
+    def meta(self):
+        return {"status": "partial" if self.errors else "ok", "errors": self.errors}
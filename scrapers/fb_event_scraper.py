@@ -6,6 +6,9 @@ import asyncio
 from urllib.parse import urlparse
 from dotenv import load_dotenv
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from .resources import get_governor
+from .errors import ErrorLog, SelectorMissError, ScrapeTimeoutError, CircuitOpenError, body_text_async, classify, classify_page
+from .circuit import call_with_policy, session_key
 
 # Load environment variables
 dotenv_path = os.path.join(os.path.dirname(__file__), os.pardir, '.env')
@@ -21,8 +24,16 @@ class FacebookEventScraper:
         os.makedirs(SESSION_DIR, exist_ok=True)
         self.session_file = SESSION_FILE
         self.headless = config.get("facebook", {}).get("headless") if config else True
+        self.governor = get_governor(config)
+
+    @staticmethod
+    def _require_credentials():
+        # Checked on first login rather than at import so other targets still load
+        if not FB_EMAIL or not FB_PASSWORD:
+            raise EnvironmentError("Missing FB_EMAIL or FB_PASSWORD in your environment variables. Please set them in your .env file.")
 
     async def _login_async(self, p):
+        self._require_credentials()
         browser = await p.chromium.launch(headless=self.headless)
         context = await browser.new_context()
         page = await context.new_page()
@@ -39,21 +50,42 @@ class FacebookEventScraper:
         await context.storage_state(path=self.session_file)
         await browser.close()
 
-    async def scrape_event_async(self, p, url):
+    async def scrape_event_async(self, p, url, browser=None):
+        async with self.governor.context_slot_async():
+            return await self._scrape_event(p, url, browser)
+
+    async def _scrape_event(self, p, url, browser=None):
         parsed = urlparse(url)
         page_url = url if parsed.scheme else f"https://{url}"
 
-        # Launch a browser and context
-        browser = await p.chromium.launch(headless=self.headless)
-        context = await browser.new_context(storage_state=self.session_file)
-        page = await context.new_page()
+        # Reuse a caller's (warm) browser if given, otherwise launch our own
+        owns_browser = browser is None
+        if owns_browser:
+            browser = await p.chromium.launch(headless=self.headless)
+        context = None
+        try:
+            # Always close the context: a leaked one stays open in a shared browser
+            context = await browser.new_context(storage_state=self.session_file)
+            page = await context.new_page()
+            self.governor.note_navigation(browser)
+            return await self._extract_event(page, page_url)
+        finally:
+            if context:
+                await context.close()
+            if owns_browser:
+                await browser.close()
 
-        # Navigate and wait
+    async def _extract_event(self, page, page_url):
+        # Navigate and wait; if the page never renders, say why (login wall, removed event...)
         await page.goto(page_url)
-        await page.wait_for_selector("div[role='main']", timeout=30000)
+        try:
+            await page.wait_for_selector("div[role='main']", timeout=30000)
+        except PlaywrightTimeoutError as e:
+            raise classify_page(page.url, await body_text_async(page)) or ScrapeTimeoutError(str(e)) from e
         print(f"✅ Loaded event page: {page_url}")
 
         data = {"link": page_url}
+        errors = ErrorLog()
         try:
             # Target the innermost span with class html-span under h1
             span = await page.query_selector("h1 span.html-span")
@@ -64,6 +96,8 @@ class FacebookEventScraper:
             else:
                 # fallback: strip h1 inner_html
                 h1 = await page.query_selector("h1")
+                if not h1:
+                    raise SelectorMissError("h1 not found")
                 print("2nd attempt to get event name")
                 html = await h1.inner_html()
                 html = re.sub(r'<img [^>]*alt=\"([^\"]+)\"[^>]*>', r'\1', html)
@@ -71,6 +105,7 @@ class FacebookEventScraper:
                 data["event_name"] = text if text.lower() != "events" else None
         except Exception as e:
             print("⚠️ Failed to extract event name:", e)
+            errors.add("event_name", e)
             data["event_name"] = None
         
         try:
@@ -89,6 +124,7 @@ class FacebookEventScraper:
             data["event_datetime"] = date_text
         except Exception as e:
             print("⚠️ Failed to extract datetime:", e)
+            errors.add("event_datetime", e)
             data["event_datetime"] = None
         
          # Extract responses count (e.g., '31.8K people responded')
@@ -102,6 +138,7 @@ class FacebookEventScraper:
             data["responses_count"] = resp
         except Exception as e:
             print("⚠️ Failed to extract responses_count:", e)
+            errors.add("responses_count", e)
             data["responses_count"] = None
 
         # Extract organizer (Event by ...)
@@ -121,6 +158,7 @@ class FacebookEventScraper:
             data["organizer_url"] = org_url
         except Exception as e:
             print("⚠️ Failed to extract organizer:", e)
+            errors.add("organizer_name", e)
             data["organizer_name"] = None
             data["organizer_url"] = None
 
@@ -132,6 +170,7 @@ class FacebookEventScraper:
                 data["venue_name"] = None
         except Exception as e:
             print("⚠️ Failed to extract venue:", e)
+            errors.add("venue_name", e)
             data["venue_name"] = None
 
         # Extract tickets info (span after div with 'Tickets')
@@ -148,50 +187,126 @@ class FacebookEventScraper:
                 data["tickets_info"] = None
         except Exception as e:
             print("⚠️ Failed to extract tickets info:", e)
+            errors.add("tickets_url", e)
             data["tickets_url"] = None
             data["tickets_info"] = None
 
-        # Clean up
-        await context.close()
-        await browser.close()
+        data["_meta"] = errors.meta()
         return data
 
-    async def scrape_discovery_events(self, limit=10):
-        events = []
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=self.headless)
+    async def scrape_discovery_events(self, limit=10, p=None, browser=None):
+        if p is None:
+            async with async_playwright() as p:
+                return await self._discover_events(p, limit, browser)
+        return await self._discover_events(p, limit, browser)
 
+    async def _discover_events(self, p, limit, browser=None):
+        owns_browser = browser is None
+        if owns_browser:
+            browser = await p.chromium.launch(headless=self.headless)
+        try:
             # Ensure logged in
             if not os.path.exists(self.session_file):
                 await self._login_async(p)
 
-            context = await browser.new_context(storage_state=self.session_file)
+            # The listing is guarded like an event: a login wall here should trip the session breaker
+            links = await call_with_policy(
+                lambda: self._collect_event_links(browser),
+                "facebook-event",
+                session_key(self),
+            )
+            # Filter only direct event pages
+            event_links = [ln for ln in set(links)
+                           if re.search(r"/events/\d{5,20}(?:/|\?|$)", ln)]
+            print("✅ Filtered event links:", event_links)
+            print(f"🔗 Found {len(event_links)} unique event links.")
+            return await self._scrape_events(p, event_links[:limit], browser, owns_browser)
+        finally:
+            if owns_browser and browser.is_connected():
+                await browser.close()
+
+    async def _collect_event_links(self, browser):
+        async with self.governor.context_slot_async():
+            return await self._scroll_event_listing(browser)
+
+    async def _scroll_event_listing(self, browser):
+        context = await browser.new_context(storage_state=self.session_file)
+        try:
             page = await context.new_page()
+            self.governor.note_navigation(browser)
             await page.goto("https://www.facebook.com/events/discovery/")
-            await page.wait_for_selector("div[role='main']", timeout=30000)
+            try:
+                await page.wait_for_selector("div[role='main']", timeout=30000)
+            except PlaywrightTimeoutError as e:
+                raise classify_page(page.url, await body_text_async(page)) or ScrapeTimeoutError(str(e)) from e
             print("🔄 Scrolling to load events...")
 
             for _ in range(3):
                 await page.mouse.wheel(0, 3000)
                 await asyncio.sleep(2)
+                reason = self.governor.page_over_limit(await self.governor.sample_page_async(page))
+                if reason:
+                    self.governor.record("page", "truncate", reason, url=page.url)
+                    break
 
-            links = await page.eval_on_selector_all(
+            return await page.eval_on_selector_all(
                 "a[href*='/events/']", "els => els.map(e => e.href)"
             )
-            # Filter only direct event pages
-            event_links = [ln for ln in set(links)
-                           if re.search(r"/events/\d{5,20}(?:/|\?|$)", ln)]
-            print("✅ Filtered event links:", event_links)
-            print(f"🔗 Found {len(event_links)} unique event links.")
-            limitation = len(event_links)
+        finally:
+            # Release the listing page before opening a context per event
+            await context.close()
 
-            for link in event_links[:limitation]:
+    async def _scrape_events(self, p, event_links, browser, owns_browser):
+        events = []
+        current = browser
+        private = None
+        try:
+            for i, link in enumerate(event_links):
+                current, private = await self._recycle_if_needed(p, browser, owns_browser, current, private)
                 try:
-                    data = await self.scrape_event_async(p, link)
-                    events.append(data)
-                except Exception as e:
-                    print(f"❌ Failed to scrape {link}: {e}")
+                    events.append(await self._scrape_one(p, link, current))
+                except CircuitOpenError as e:
+                    # Session or platform is failing; stop burning the rest of the list
+                    print(f"⛔ Stopping discovery: {e}")
+                    events.extend(self._failed_event(ln, e) for ln in event_links[i:])
+                    break
+        finally:
+            if private and private.is_connected():
+                await private.close()
+        return events
 
-            await context.close()
-            await browser.close()
-        return events
\ No newline at end of file
+    async def _recycle_if_needed(self, p, browser, owns_browser, current, private):
+        """
+        Swap in a fresh browser once the current one passes its RSS or navigation limits.
+        """
+        sample = await self.governor.sample_browser_async(current)
+        reason = self.governor.browser_over_limit(sample, self.governor.navigations(current))
+        if not reason:
+            return current, private
+        self.governor.record("browser", "recycle", reason)
+        # A caller's shared browser stays up for its other users; the service recycles it
+        if current is not browser or owns_browser:
+            await current.close()
+        private = await p.chromium.launch(headless=self.headless)
+        return private, private
+
+    async def _scrape_one(self, p, link, browser):
+        """
+        Scrape one discovered event; failures come back as a record with a failed _meta.
+        CircuitOpenError is raised so the caller can stop the run.
+        """
+        try:
+            return await call_with_policy(
+                lambda: self.scrape_event_async(p, link, browser=browser),
+                "facebook-event",
+                session_key(self),
+            )
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            print(f"❌ Failed to scrape {link} ({classify(e).kind}): {e}")
+            return self._failed_event(link, e)
+
+    @staticmethod
+    def _failed_event(link, exc):
+        return {"link": link, "_meta": {"status": "failed", "errors": [classify(exc).to_dict()]}}
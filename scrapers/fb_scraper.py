@@ -4,6 +4,8 @@ import time
 from urllib.parse import urlparse
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from .resources import get_governor
+from .errors import ErrorLog, SelectorMissError, ScrapeTimeoutError, body_text, classify_page
 
 # Load environment variables from .env (located one level up)
 dotenv_path = os.path.join(os.path.dirname(__file__), os.pardir, '.env')
@@ -12,8 +14,6 @@ load_dotenv(dotenv_path)
 # Facebook credentials
 FB_EMAIL = os.getenv("FB_EMAIL")
 FB_PASSWORD = os.getenv("FB_PASSWORD")
-if not FB_EMAIL or not FB_PASSWORD:
-    raise EnvironmentError("Missing FB_EMAIL or FB_PASSWORD in your environment variables. Please set them in your .env file.")
 
 # Session storage paths
 SESSION_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "session")
@@ -24,6 +24,13 @@ class FacebookScraper:
         # Ensure session directory exists
         os.makedirs(SESSION_DIR, exist_ok=True)
         self.session_file = SESSION_FILE
+        self.governor = get_governor(config)
+
+    @staticmethod
+    def _require_credentials():
+        # Checked on first login rather than at import so other targets still load
+        if not FB_EMAIL or not FB_PASSWORD:
+            raise EnvironmentError("Missing FB_EMAIL or FB_PASSWORD in your environment variables. Please set them in your .env file.")
 
     def scrape(self, link):
         """
@@ -38,11 +45,12 @@ class FacebookScraper:
         parsed = urlparse(url)
         page_url = url if parsed.scheme else f"https://{url}"
 
-        with sync_playwright() as p:
+        with self.governor.context_slot(), sync_playwright() as p:
             browser = p.chromium.launch(headless=True)
 
             # Perform login + save session if none exists
             if not os.path.exists(self.session_file):
+                self._require_credentials()
                 ctx_login = browser.new_context()
                 page = ctx_login.new_page()
                 page.goto("https://www.facebook.com/login")
@@ -71,13 +79,17 @@ class FacebookScraper:
                 if(dlg) dlg.remove();
             """)
 
-            # Wait for main content
-            page.wait_for_selector("div[role='main']", timeout=30000)
+            # Wait for main content; if it never shows, say why (login wall, removed page...)
+            try:
+                page.wait_for_selector("div[role='main']", timeout=30000)
+            except PlaywrightTimeoutError as e:
+                raise classify_page(page.url, body_text(page)) or ScrapeTimeoutError(str(e)) from e
             print(f"✅ Loaded Facebook page: {page_url}")
             
             print("🔄 Scraping...", page)
 
             data = {"link": page_url}
+            errors = ErrorLog()
 
             # Profile / Page name
             # Profile / Page name and nickname
@@ -95,16 +107,19 @@ class FacebookScraper:
                     data["name"] = full_name
                     data["nickname"] = nickname
                 else:
+                    errors.add("name", SelectorMissError("h1 not found"))
                     data["name"] = None
                     data["nickname"] = None
-            except:
+            except Exception as e:
+                errors.add("name", e)
                 data["name"] = None
                 data["nickname"] = None
                 
             try:
                 cover_el = page.query_selector("img[data-imgperflogname='profileCoverPhoto']")
                 data["cover_photo"] = cover_el.get_attribute('src') if cover_el else None
-            except:
+            except Exception as e:
+                errors.add("cover_photo", e)
                 data["cover_photo"] = None
             
             try:
@@ -115,7 +130,8 @@ class FacebookScraper:
                     data["profile_photo"] = profile_svg_img.get_attribute('xlink:href') or profile_svg_img.get_attribute('href')
                 else:
                     data["profile_photo"] = None
-            except:
+            except Exception as e:
+                errors.add("profile_photo", e)
                 data["profile_photo"] = None
 
             try:
@@ -125,6 +141,7 @@ class FacebookScraper:
                 data["connections_count"] = match.group(1) if match else raw_text
             except Exception as e:
                 print("ERROR fetching connections count:", e)
+                errors.add("connections_count", e)
                 data["connections_count"] = None
                 
             try:
@@ -135,7 +152,8 @@ class FacebookScraper:
                     .first
                 )
                 data["about_raw"] = about_card.inner_text().strip()
-            except Exception:
+            except Exception as e:
+                errors.add("about_raw", e)
                 data["about_raw"] = None
 
             posts = []
@@ -145,18 +163,18 @@ class FacebookScraper:
                     # Content
                     try:
                         content = art.query_selector("div[dir='auto']").inner_text()
-                    except:
+                    except Exception:
                         content = None
                     # Timestamp
                     try:
                         ts = art.query_selector("abbr").get_attribute('title')
-                    except:
+                    except Exception:
                         ts = None
                     # Permalink
                     try:
                         link_el = art.query_selector("a[aria-hidden='true']")
                         permalink = link_el.get_attribute('href')
-                    except:
+                    except Exception:
                         permalink = None
                     # Comments
                     comps = []
@@ -170,10 +188,10 @@ class FacebookScraper:
                             try:
                                 user = c.query_selector("strong").inner_text()
                                 txt = c.query_selector("span[dir='auto']").inner_text()
-                            except:
+                            except Exception:
                                 user, txt = None, None
                             comps.append({"user": user, "text": txt})
-                    except:
+                    except Exception:
                         pass
 
                     posts.append({
@@ -183,10 +201,18 @@ class FacebookScraper:
                         "comments": comps
                     })
 
+                # Feed pages grow without bound; stop scrolling once the heap is too large
+                reason = self.governor.page_over_limit(self.governor.sample_page(page))
+                if reason:
+                    self.governor.record("page", "truncate", reason, url=page_url)
+                    data["truncated"] = True
+                    break
+
                 page.evaluate("window.scrollBy(0, document.body.scrollHeight)")
                 time.sleep(2)
 
             data["posts"] = posts
+            data["_meta"] = errors.meta()
 
             context.close()
             browser.close()
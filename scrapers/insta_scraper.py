@@ -4,6 +4,8 @@ import time
 import re
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from .resources import get_governor
+from .errors import ErrorLog, SelectorMissError, ScrapeTimeoutError, body_text, classify_page
 
 # Load environment variables
 load_dotenv()
@@ -21,6 +23,7 @@ class InstagramScraper:
         # Ensure session directory exists
         os.makedirs(SESSION_DIR, exist_ok=True)
         self.session_file = SESSION_FILE
+        self.governor = get_governor(config)
 
     def scrape(self, link):
         """
@@ -85,38 +88,53 @@ class InstagramScraper:
         """
         Navigate to the user profile, extract bio, stats, and recent post URLs.
         """
-        with sync_playwright() as p:
+        with self.governor.context_slot(), sync_playwright() as p:
             context = self._get_context(p)
             page = context.new_page()
             profile_url = PROFILE_URL_TEMPLATE.format(username=username)
             page.goto(profile_url)
-            page.wait_for_selector("header", timeout=15000)
+            try:
+                page.wait_for_selector("header", timeout=15000)
+            except PlaywrightTimeoutError as e:
+                raise classify_page(page.url, body_text(page)) or ScrapeTimeoutError(str(e)) from e
             print(f"✅ Loaded Instagram profile: {username}")
             data = {"username": username}
+            errors = ErrorLog()
             # Full name
             try:
-                data["full_name"] = page.query_selector("header section div h1").inner_text().strip()
-            except:
+                name_el = page.query_selector("header section div h1")
+                if not name_el:
+                    raise SelectorMissError("header h1 not found")
+                data["full_name"] = name_el.inner_text().strip()
+            except Exception as e:
+                errors.add("full_name", e)
                 data["full_name"] = None
             # Stats: posts, followers, following
             try:
                 stats = page.query_selector_all("header li span span")
+                if len(stats) < 3:
+                    raise SelectorMissError(f"expected 3 header stats, found {len(stats)}")
                 data["posts_count"] = stats[0].inner_text().replace(',', '')
                 data["followers_count"] = stats[1].get_attribute('title') or stats[1].inner_text()
                 data["following_count"] = stats[2].inner_text()
-            except:
+            except Exception as e:
+                errors.add("stats", e)
                 data.update({"posts_count": None, "followers_count": None, "following_count": None})
             # Bio
             try:
-                data["bio"] = page.query_selector("header section div span").inner_text().strip()
-            except:
+                bio_el = page.query_selector("header section div span")
+                if not bio_el:
+                    raise SelectorMissError("header bio span not found")
+                data["bio"] = bio_el.inner_text().strip()
+            except Exception as e:
+                errors.add("bio", e)
                 data["bio"] = None
             # Recent posts (with cookie acceptance and bounded scrolling)
             # Accept cookie banner if present
             try:
                 page.click("button:has-text('Accept All')", timeout=5000)
                 page.wait_for_timeout(2000)
-            except:
+            except Exception:
                 pass
             post_urls = set()
             scroll_attempts = 0
@@ -136,6 +154,7 @@ class InstagramScraper:
             if not post_urls:
                 print("⚠️ No posts found. You may need to check your login/session or selectors.")
             data["recent_posts"] = list(post_urls)[:post_limit][:post_limit]
+            data["_meta"] = errors.meta()
             context.close()
             return data
 
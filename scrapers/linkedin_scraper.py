@@ -1,10 +1,15 @@
 import re
 import os
+import json
 import asyncio
 import random
 from TikTokApi import TikTokApi
 from playwright.async_api import async_playwright  # async version
 
+SESSION_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "session")
+# play_url only serves the session that listed it; the media stage sends these cookies back
+COOKIE_FILE = os.path.join(SESSION_DIR, "tiktok_cookies.json")
+
 class LinkedInScraper:
     def __init__(self, config=None):
         self.browser = os.environ.get("TIKTOK_BROWSER", "chromium")
@@ -47,6 +52,7 @@ class LinkedInScraper:
                 headless=False,
                 browser=self.browser
             )
+            await self._save_cookies(api)
 
             if "/@" in link:
                 username = self.extract_username(link)
@@ -60,6 +66,13 @@ class LinkedInScraper:
             else:
                 raise ValueError("Unsupported TikTok link format")
 
+    async def _save_cookies(self, api):
+        # msToken and tt_chain_token, without which the CDN rejects play_url downloads
+        cookies = await api.get_session_cookies(api.sessions[0])
+        os.makedirs(SESSION_DIR, exist_ok=True)
+        with open(COOKIE_FILE, "w", encoding="utf-8") as f:
+            json.dump(cookies, f)
+
     async def _get_user_profile_and_videos(self, api, user):
         try:
             user_info_raw = await user.info()
@@ -74,6 +87,7 @@ class LinkedInScraper:
         user_data = {
             "username": user_info.get("user", {}).get("uniqueId"),
             "nickname": user_info.get("user", {}).get("nickname"),
+            "avatar": user_info.get("user", {}).get("avatarLarger"),
             "followers": user_info.get("stats", {}).get("followerCount"),
             "following": user_info.get("stats", {}).get("followingCount"),
             "likes": user_info.get("stats", {}).get("heartCount"),
@@ -92,6 +106,7 @@ class LinkedInScraper:
                 "stats": video_info.get("stats"),
                 "music": video_info.get("music", {}).get("title"),
                 "video_url": video.url,
+                "play_url": video_info.get("video", {}).get("playAddr"),
                 "hashtags": [tag.get("hashtagName") for tag in video_info.get("textExtra", []) if tag.get("type") == 1]
             })
             user_data["videos"].append(enriched)
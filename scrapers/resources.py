@@ -0,0 +1,221 @@
+import asyncio
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+
+DEFAULT_LIMITS = {
+    "max_page_heap_mb": 512,       # JS heap of a single page before it is recycled
+    "max_browser_rss_mb": 2048,    # RSS of all browser processes before the browser is recycled
+    "max_renderer_rss_mb": 1024,   # RSS of a single renderer (page) process before the browser is recycled
+    "max_navigations": 50,         # page navigations on one browser before it is recycled
+    "max_contexts": 4,             # browser contexts open at once across all scrapers
+}
+
+MB = 1024 * 1024
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_governor(config=None):
+    """
+    Return the process-wide governor, creating it from config["resources"] on first use.
+    """
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = ResourceGovernor((config or {}).get("resources"))
+        return _governor
+
+
+def _rss_of_pid(pid):
+    # Linux only; /proc/<pid>/statm reports resident pages in its second field
+    page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * page_size
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _rss_from_process_info(result):
+    """
+    Total RSS of the browser's processes and the largest renderer, or None off Linux.
+    """
+    total = 0
+    max_renderer = 0
+    found = False
+    for proc in result.get("processInfo", []):
+        rss = _rss_of_pid(proc.get("id")) if proc.get("id") else None
+        if rss is None:
+            continue
+        found = True
+        total += rss
+        if proc.get("type") == "renderer":
+            max_renderer = max(max_renderer, rss)
+    return {"rss": total, "max_renderer_rss": max_renderer} if found else None
+
+
+def _heap_from_metrics(result):
+    for metric in result.get("metrics", []):
+        if metric.get("name") == "JSHeapUsedSize":
+            return int(metric["value"])
+    return None
+
+
+class ResourceGovernor:
+    """
+    Tracks browser RSS and page JS heap through CDP, caps open contexts and decides
+    when browsers should be recycled or page growth stopped. Counters live in
+    self.metrics and recent decisions in self.decisions.
+    """
+
+    def __init__(self, limits=None):
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self._contexts = threading.BoundedSemaphore(self.limits["max_contexts"])
+        self._lock = threading.Lock()
+        self.metrics = {
+            "open_contexts": 0,
+            "context_waits": 0,
+            "pages_sampled": 0,
+            "browsers_sampled": 0,
+            "page_truncations": 0,
+            "browser_recycles": 0,
+            "peak_page_heap_mb": 0.0,
+            "peak_browser_rss_mb": 0.0,
+            "peak_renderer_rss_mb": 0.0,
+        }
+        self.decisions = deque(maxlen=100)
+        self._navigations = weakref.WeakKeyDictionary()
+
+    # --- decisions ---
+
+    _ACTION_COUNTERS = {
+        ("page", "truncate"): "page_truncations",
+        ("browser", "recycle"): "browser_recycles",
+    }
+
+    def record(self, scope, action, reason, **values):
+        with self._lock:
+            key = self._ACTION_COUNTERS.get((scope, action))
+            if key:
+                self.metrics[key] += 1
+            self.decisions.append({"time": time.time(), "scope": scope, "action": action, "reason": reason, **values})
+        print(f"♻️ {action} {scope}: {reason}")
+
+    def _track_peak(self, key, value_bytes):
+        with self._lock:
+            self.metrics[key] = max(self.metrics[key], round(value_bytes / MB, 1))
+
+    def page_over_limit(self, heap_bytes):
+        if heap_bytes is None:
+            return None
+        self._track_peak("peak_page_heap_mb", heap_bytes)
+        if heap_bytes > self.limits["max_page_heap_mb"] * MB:
+            return f"JS heap {heap_bytes / MB:.0f}MB > {self.limits['max_page_heap_mb']}MB"
+        return None
+
+    def browser_over_limit(self, sample, navigations):
+        if sample is not None:
+            rss, renderer_rss = sample["rss"], sample["max_renderer_rss"]
+            self._track_peak("peak_browser_rss_mb", rss)
+            self._track_peak("peak_renderer_rss_mb", renderer_rss)
+            if rss > self.limits["max_browser_rss_mb"] * MB:
+                return f"RSS {rss / MB:.0f}MB > {self.limits['max_browser_rss_mb']}MB"
+            if renderer_rss > self.limits["max_renderer_rss_mb"] * MB:
+                return f"renderer RSS {renderer_rss / MB:.0f}MB > {self.limits['max_renderer_rss_mb']}MB"
+        if navigations >= self.limits["max_navigations"]:
+            return f"{navigations} navigations >= {self.limits['max_navigations']}"
+        return None
+
+    def note_navigation(self, browser):
+        with self._lock:
+            self._navigations[browser] = self._navigations.get(browser, 0) + 1
+
+    def navigations(self, browser):
+        with self._lock:
+            return self._navigations.get(browser, 0)
+
+    # --- context cap ---
+
+    def _acquire_context(self):
+        if not self._contexts.acquire(blocking=False):
+            with self._lock:
+                self.metrics["context_waits"] += 1
+            self._contexts.acquire()
+        with self._lock:
+            self.metrics["open_contexts"] += 1
+
+    def _release_context(self):
+        with self._lock:
+            self.metrics["open_contexts"] -= 1
+        self._contexts.release()
+
+    @contextmanager
+    def context_slot(self):
+        self._acquire_context()
+        try:
+            yield
+        finally:
+            self._release_context()
+
+    @asynccontextmanager
+    async def context_slot_async(self):
+        # Waiting on the shared (thread) semaphore must not block the event loop
+        acquiring = asyncio.ensure_future(asyncio.to_thread(self._acquire_context))
+        try:
+            await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # The thread still gets the slot eventually; give it straight back
+            acquiring.add_done_callback(
+                lambda f: self._release_context() if not f.cancelled() and f.exception() is None else None
+            )
+            raise
+        try:
+            yield
+        finally:
+            self._release_context()
+
+    # --- CDP sampling (Chromium only, None elsewhere) ---
+
+    def sample_page(self, page):
+        try:
+            session = page.context.new_cdp_session(page)
+            session.send("Performance.enable")
+            heap = _heap_from_metrics(session.send("Performance.getMetrics"))
+            session.detach()
+        except Exception:
+            return None
+        with self._lock:
+            self.metrics["pages_sampled"] += 1
+        return heap
+
+    async def sample_page_async(self, page):
+        try:
+            session = await page.context.new_cdp_session(page)
+            await session.send("Performance.enable")
+            heap = _heap_from_metrics(await session.send("Performance.getMetrics"))
+            await session.detach()
+        except Exception:
+            return None
+        with self._lock:
+            self.metrics["pages_sampled"] += 1
+        return heap
+
+    async def sample_browser_async(self, browser):
+        try:
+            session = await browser.new_browser_cdp_session()
+            info = await session.send("SystemInfo.getProcessInfo")
+            await session.detach()
+        except Exception:
+            return None
+        with self._lock:
+            self.metrics["browsers_sampled"] += 1
+        return _rss_from_process_info(info)
+
+    def snapshot(self):
+        with self._lock:
+            return {**self.metrics, "limits": dict(self.limits), "recent_decisions": list(self.decisions)[-10:]}
@@ -0,0 +1,360 @@
+import asyncio
+import json
+import time
+import uuid
+from http import HTTPStatus
+from urllib.parse import urlparse
+
+from scrapers import get_scraper, is_registered
+from scrapers.resources import get_governor
+from scrapers.circuit import call_with_policy, get_breakers, session_key
+from scrapers.errors import classify
+
+DEFAULT_SERVICE_CONFIG = {
+    "host": "127.0.0.1",
+    "port": 8080,
+    "workers": 2,          # jobs running concurrently
+    "queue_size": 16,      # pending jobs before new ones are rejected with 503
+    "job_timeout": 300,    # seconds a sync (wait=true) request waits for its result
+    "max_jobs": 1000,      # finished jobs kept around for polling
+    "save": False,         # also append results to outputs/<target>_output.json
+}
+
+MAX_BODY_BYTES = 1 << 20
+
+# Targets that run on the shared warm browser. The others are sync Playwright
+# scrapers that still launch their own Chromium per job (cold start).
+WARM_TARGETS = {"facebook-event"}
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, target, mode, link=None, options=None):
+        self.id = uuid.uuid4().hex
+        self.target = target
+        self.mode = mode
+        self.link = link
+        self.options = options or {}
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = asyncio.Event()
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "target": self.target,
+            "mode": self.mode,
+            "link": self.link,
+            "status": self.status,
+            "warm_browser": self.target in WARM_TARGETS,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class ScrapeService:
+    """
+    Long-lived scrape server: keeps Playwright and a browser warm, runs jobs from a
+    bounded queue and exposes them over a small local HTTP/JSON API.
+    """
+
+    def __init__(self, config, on_result=None):
+        self.config = config or {}
+        self.settings = {**DEFAULT_SERVICE_CONFIG, **self.config.get("service", {})}
+        self.headless = self.config.get("facebook", {}).get("headless", True)
+        self.on_result = on_result
+        self.governor = get_governor(self.config)
+        self.breakers = get_breakers(self.config)
+        self.queue = asyncio.Queue(maxsize=self.settings["queue_size"])
+        self.jobs = {}
+        self._scrapers = {}
+        self._playwright_cm = None
+        self._playwright = None
+        self._browser = None
+        self._browser_lock = asyncio.Lock()
+        # Users per browser; a recycled browser drains here until its last job ends
+        self._browser_users = {}
+        self._media = None
+        self._workers = []
+        self._server = None
+
+    # --- warm resources ---
+
+    def _get_scraper(self, target):
+        # One instance per target so per-scraper state (tokens, sessions) stays warm
+        if target not in self._scrapers:
+            self._scrapers[target] = get_scraper(target)(self.config)
+        return self._scrapers[target]
+
+    async def _acquire_browser(self):
+        async with self._browser_lock:
+            if self._browser and self._browser.is_connected():
+                sample = await self.governor.sample_browser_async(self._browser)
+                reason = self.governor.browser_over_limit(sample, self.governor.navigations(self._browser))
+                if reason:
+                    # Running jobs keep the old browser; it closes when the last one releases it
+                    self.governor.record("browser", "recycle", reason)
+                    draining = self._browser
+                    self._browser = None
+                    if not self._browser_users.get(draining):
+                        await self._close_browser(draining)
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    from playwright.async_api import async_playwright
+                    self._playwright_cm = async_playwright()
+                    self._playwright = await self._playwright_cm.__aenter__()
+                self._browser = await self._playwright.chromium.launch(headless=self.headless)
+                print("🟢 Launched warm browser")
+            browser = self._browser
+            self._browser_users[browser] = self._browser_users.get(browser, 0) + 1
+            return browser
+
+    async def _release_browser(self, browser):
+        self._browser_users[browser] -= 1
+        if self._browser_users[browser] == 0 and browser is not self._browser:
+            await self._close_browser(browser)
+
+    async def _close_browser(self, browser):
+        self._browser_users.pop(browser, None)
+        try:
+            await browser.close()
+        except Exception as e:
+            print(f"⚠️ Failed to close recycled browser: {e}")
+
+    def _get_media(self):
+        # Shared so the HTTP connection pool stays warm across jobs
+        if self._media is None:
+            from media import MediaDownloader
+            self._media = MediaDownloader(self.config)
+        return self._media
+
+    # --- jobs ---
+
+    def submit(self, target, mode="single", link=None, options=None):
+        if not is_registered(target):
+            raise ValueError(f"Unsupported platform: {target}")
+        if mode not in ("single", "discovery"):
+            raise ValueError(f"Invalid mode: {mode}")
+        if mode == "single" and not link:
+            raise ValueError("You must specify link for single mode")
+        if mode == "discovery" and target != "facebook-event":
+            raise ValueError("Invalid mode or unsupported target for discovery")
+        if options is not None and not isinstance(options, dict):
+            raise ValueError("options must be a JSON object")
+        if options and "limit" in options:
+            try:
+                options["limit"] = int(options["limit"])
+            except (TypeError, ValueError):
+                raise ValueError("options.limit must be an integer")
+
+        job = Job(target, mode, link, options)
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFull(f"Job queue is full ({self.queue.maxsize} pending)")
+        self.jobs[job.id] = job
+        self._prune_jobs()
+        return job
+
+    def _prune_jobs(self):
+        excess = len(self.jobs) - self.settings["max_jobs"]
+        if excess <= 0:
+            return
+        finished = [j for j in self.jobs.values() if j.done.is_set()]
+        finished.sort(key=lambda j: j.finished_at)
+        for job in finished[:excess]:
+            del self.jobs[job.id]
+
+    async def _run_job(self, job):
+        scraper = self._get_scraper(job.target)
+        if job.mode == "discovery":
+            # Each discovered event already goes through the breakers on its own
+            return await self._run_scraper(scraper, job)
+        return await call_with_policy(
+            lambda: self._run_scraper(scraper, job),
+            job.target,
+            session_key(scraper),
+            self.breakers,
+        )
+
+    async def _run_scraper(self, scraper, job):
+        if job.target in WARM_TARGETS:
+            browser = await self._acquire_browser()
+            try:
+                if job.mode == "discovery":
+                    limit = job.options.get("limit", 5)
+                    return await scraper.scrape_discovery_events(limit=limit, p=self._playwright, browser=browser)
+                return await scraper.scrape_event_async(self._playwright, job.link, browser=browser)
+            finally:
+                await self._release_browser(browser)
+        # Sync scrapers own their Playwright instance; keep them off the event loop
+        return await asyncio.to_thread(scraper.scrape, job.link)
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                job.result = await self._run_job(job)
+                if job.options.get("media", self.config.get("media", {}).get("enabled")):
+                    job.result = await self._get_media().process(job.result)
+                job.status = "done"
+                if self.on_result and job.options.get("save", self.settings["save"]):
+                    await asyncio.to_thread(self.on_result, job.target, job.result)
+            except Exception as e:
+                err = classify(e)
+                print(f"❌ Job {job.id} failed ({err.kind}): {e}")
+                job.status = "failed"
+                job.error = err.to_dict()
+            finally:
+                job.finished_at = time.time()
+                job.done.set()
+                self.queue.task_done()
+
+    # --- HTTP API ---
+
+    async def _handle(self, reader, writer):
+        try:
+            status, payload = await self._dispatch(reader)
+        except Exception as e:
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            "Connection: close",
+        ]
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            head.append("Retry-After: 1")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _dispatch(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        if not request_line:
+            return HTTPStatus.BAD_REQUEST, {"error": "Empty request"}
+        parts = request_line.split(" ", 2)
+        if len(parts) != 3:
+            return HTTPStatus.BAD_REQUEST, {"error": "Malformed request line"}
+        method, target, _ = parts
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length"}
+        if length < 0:
+            return HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length"}
+        if length > MAX_BODY_BYTES:
+            return HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Request body too large"}
+        body = await reader.readexactly(length) if length else b""
+        path = urlparse(target).path.rstrip("/") or "/"
+
+        if method == "GET" and path == "/health":
+            return HTTPStatus.OK, self.stats()
+        if method == "GET" and path == "/metrics":
+            return HTTPStatus.OK, {
+                **self.stats(),
+                "resources": self.governor.snapshot(),
+                "breakers": self.breakers.snapshot(),
+            }
+        if method == "GET" and path.startswith("/jobs/"):
+            job = self.jobs.get(path[len("/jobs/"):])
+            if not job:
+                return HTTPStatus.NOT_FOUND, {"error": "Unknown job"}
+            return HTTPStatus.OK, job.to_dict()
+        if method == "POST" and path == "/scrape":
+            try:
+                spec = json.loads(body or b"{}")
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                return HTTPStatus.BAD_REQUEST, {"error": "Body must be JSON"}
+            if not isinstance(spec, dict):
+                return HTTPStatus.BAD_REQUEST, {"error": "Body must be a JSON object"}
+            return await self._scrape(spec)
+        return HTTPStatus.NOT_FOUND, {"error": f"No route for {method} {path}"}
+
+    async def _scrape(self, spec):
+        try:
+            job = self.submit(
+                spec.get("target"),
+                spec.get("mode", "single"),
+                spec.get("link"),
+                spec.get("options"),
+            )
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except QueueFull as e:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)}
+
+        if not spec.get("wait", False):
+            return HTTPStatus.ACCEPTED, {"job_id": job.id, "status": job.status}
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout=self.settings["job_timeout"])
+        except asyncio.TimeoutError:
+            # Still running; the caller can poll for it
+            return HTTPStatus.ACCEPTED, {"job_id": job.id, "status": job.status}
+        return HTTPStatus.OK, job.to_dict()
+
+    def stats(self):
+        return {
+            "status": "ok",
+            "queued": self.queue.qsize(),
+            "queue_size": self.queue.maxsize,
+            "running": sum(1 for j in self.jobs.values() if j.status == "running"),
+            "browser_warm": bool(self._browser and self._browser.is_connected()),
+            "warm_targets": sorted(WARM_TARGETS),
+            "browser_navigations": self.governor.navigations(self._browser) if self._browser else 0,
+            "draining_browsers": sum(1 for b in self._browser_users if b is not self._browser),
+            "open_contexts": self.governor.metrics["open_contexts"],
+        }
+
+    # --- lifecycle ---
+
+    async def start(self):
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.settings["workers"])]
+        self._server = await asyncio.start_server(self._handle, self.settings["host"], self.settings["port"])
+        print(f"🟢 Scrape service listening on http://{self.settings['host']}:{self.settings['port']}")
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        if self._media:
+            await self._media.close()
+        for browser in [b for b in self._browser_users if b is not self._browser]:
+            await self._close_browser(browser)
+        if self._browser:
+            await self._browser.close()
+        if self._playwright_cm:
+            await self._playwright_cm.__aexit__(None, None, None)
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()